@@ -1,60 +1,196 @@
 #!/usr/bin/env python3
 
-import os, re, time, random, requests
+import os, re, json, math, random, threading, requests, requests_cache
+from collections import OrderedDict, deque
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+from lxml import html as lxml_html
+from selectolax.lexbor import LexborHTMLParser
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 
+_ESC = str.maketrans({'&':'&amp;','<':'&lt;','>':'&gt;'})
+# pdf item kind -> (style name, spacer height)
+_KINDS = {'h1':('Heading1',24),'h2':('Heading2',12),'p':('Normal',6)}
+_BLOCKED = frozenset({'reddit','twitter','facebook','twitch'})
+
+def _css(node, sel):
+    # lexbor returns a node once per matching selector of a union
+    return list(dict.fromkeys(node.css(sel)))
+
+def _valid_paras(ps):
+    # story paragraphs: long enough and not a plug for another story
+    for p in ps:
+        text=p.text(strip=True)
+        if len(text)>10 and p.css_first('a[href*="/s/"]') is None: yield text
+
+@lru_cache(maxsize=1024)
+def _is_blocked(host):
+    return any(k in host for k in _BLOCKED)
+
 class StoryScraperFramework:
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    WORKERS = 4
+    PAGE_CACHE = 256
+    BACKOFF_CAP = 60
+    # stand-in titles that say nothing about which pdf a story became
+    PLACEHOLDER_TITLES = ('Unknown','Untitled')
+    # tried in the original priority order, first entry with usable matches
+    # wins. Only the adjacent story-container selectors share a comma union
+    # (matches come back in document order); selectors that can only match
+    # a subset of an earlier entry (any h1, h3 a[href*="/s/"], div.content p)
+    # are left out since they could never change the result
+    LINK_SELS = ('a[href*="/s/"]','.story-title a','div.story-list h3 a',
+                 'div.content-item a[href*="story"]','article h2 a','h3 a, h4 a, h2 a')
+    T_SELS = ('h1','.story-title','.title','h2.entry-title','div.story-header h2')
+    BODY_SELS = ('div.story-text p, .story-content p, .story-body p, #story p',
+                 'div[class*="story"] p','.content p','.entry-content p','article p',
+                 '#story-text p','.post-content p','div.text p','main p','p')
+    N_SEL = 'a[href*="chapter"], a[href*="page"], .next-chapter a'
+    CH_SELS = ('ul.series__works a.br_rj[href*="/s/"]','div.sl-list a.br_rj[href*="/s/"]',
+               'div.sl-list a[href*="/s/"]','div.series-nav a[href*="/s/"]')
+    PAGE_SEL = 'a[href*="page="], .pagination .next, a[rel="next"], .page-numbers.next'
+    _FN_BAD = re.compile(r'[<>:"/\\|?*]')
+    _FN_WS = re.compile(r'\s+')
+    _CH_NUM = re.compile(r'(?:Ch\.?|Pt\.?)\s*(\d+)(?:-\d+)?', re.I)
+    _PAGE_NUM = re.compile(r'page=\d+')
+    _META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+
     def __init__(self, base_url, downloads_folder="downloads"):
         self.base_url = base_url
         self.downloads_folder = downloads_folder
-        self.session = requests.Session()
+        os.makedirs(self.downloads_folder, exist_ok=True)
+        # on-disk cache so reruns revalidate instead of refetching; series
+        # index pages expire sooner as new chapters get added to them
+        self.session = requests_cache.CachedSession(
+            os.path.join(self.downloads_folder, '.http_cache.sqlite'), backend='sqlite',
+            expire_after=86400, urls_expire_after={'*/series/se/*': 3600},
+            allowable_methods=('GET',), cache_control=True, stale_if_error=True)
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': self.USER_AGENT,
+            'Connection': 'keep-alive',
+            # only the codings urllib3 can decode here (br needs brotli)
+            'Accept-Encoding': ACCEPT_ENCODING
         })
-        os.makedirs(self.downloads_folder, exist_ok=True)
+        # retries stay in make_request_with_retry
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=0))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._styles = getSampleStyleSheet()
+        # caps in-flight requests across all worker threads
+        self._slots = threading.BoundedSemaphore(self.WORKERS)
+        # set on Ctrl-C/abort so running workers wind down early
+        self._stop = threading.Event()
+        # url -> (title, paras, ch_links, series), LRU bounded to PAGE_CACHE
+        self._page_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # story url -> saved pdf name, lets reruns skip without fetching
+        self._index_path = os.path.join(self.downloads_folder, '.index.json')
+        self._index_lock = threading.Lock()
+        # pdf name -> Event set once the worker writing it finishes
+        self._claimed = {}
+        try:
+            with open(self._index_path, encoding='utf-8') as f: self._index = json.load(f)
+        except (OSError, ValueError): self._index = {}
+
+    def _parse(self, r):
+        # r.text only when the server named a charset: otherwise requests
+        # either guesses (slow) or falls back to latin-1 for text/html, and
+        # lexbor would read raw bytes as utf-8, so use <meta charset> instead
+        if 'charset' in r.headers.get('Content-Type', '').lower(): content = r.text
+        else:
+            m = self._META_CHARSET.search(r.content[:1024])
+            enc = m.group(1).decode('ascii') if m else 'utf-8'
+            try: content = r.content.decode(enc, 'replace')
+            except LookupError: content = r.content.decode('utf-8', 'replace')
+        try: return LexborHTMLParser(content)
+        except Exception:
+            # lexbor rejected the markup, let libxml2 repair it first
+            return LexborHTMLParser(lxml_html.tostring(lxml_html.fromstring(content), encoding='unicode'))
+
+    def _backoff(self, attempt, resp):
+        # honor Retry-After (seconds form) on 429/503, else capped exponential
+        ra = resp.headers.get('Retry-After') if resp is not None else None
+        if ra:
+            try: wait = float(ra)
+            except ValueError: wait = None
+            if wait is not None and math.isfinite(wait): return min(max(wait, 0), self.BACKOFF_CAP)
+        return min(2**attempt + random.random(), self.BACKOFF_CAP)
 
     def make_request_with_retry(self, url, max_retries=3):
-        blocked = ['reddit','twitter','facebook','twitch']
-        host = urlparse(url).hostname.lower() if urlparse(url).hostname else ''
-        if any(k in host for k in blocked): return None
+        host = (urlparse(url).hostname or '').lower()
+        if _is_blocked(host): return None
         for attempt in range(max_retries+1):
             try:
-                delay = random.uniform(1.0, 3.0) if attempt==0 else random.uniform(2**attempt, 2**(attempt+1))
-                time.sleep(delay)
-                r = self.session.get(url, timeout=30)
+                with self._slots: r = self.session.get(url, timeout=30)
                 r.raise_for_status()
                 return r
             except requests.RequestException as e:
+                code = e.response.status_code if e.response is not None else None
+                if code and 400<=code<500 and code not in (408,429):
+                    print(f"[ERROR] {url}: {e}"); return None
                 if attempt==max_retries:
                     print(f"[ERROR] {url} failed after {max_retries+1} tries: {e}")
                     return None
                 else:
                     print(f"[WARNING] {url} attempt {attempt+1}: {e}")
+                    if self._stop.wait(self._backoff(attempt, e.response)): return None
+
+    def _remember(self, urls, fn):
+        with self._index_lock:
+            for u in urls: self._index[u] = fn
+            # write a temp file and swap it in, an interrupted dump must
+            # not leave a truncated index that the next run throws away
+            tmp = self._index_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f: json.dump(self._index, f)
+            os.replace(tmp, self._index_path)
+
+    def _claim(self, fn, held):
+        # held: names this scrape_story call already owns. Waits while
+        # another worker holds fn; False means that worker saved the pdf
+        if fn in held: return True
+        while True:
+            with self._index_lock:
+                done = self._claimed.get(fn)
+                if done is None:
+                    self._claimed[fn] = threading.Event(); held.add(fn); return True
+            print(f"[WAIT] {fn} in progress")
+            done.wait()
+            if os.path.exists(os.path.join(self.downloads_folder, f"{fn}.pdf")): return False
+
+    def _release(self, held):
+        with self._index_lock:
+            for fn in held: self._claimed.pop(fn).set()
+        held.clear()
+
+    def _already_saved(self, stitle, surl):
+        fn = self._index.get(surl)
+        if fn and os.path.exists(os.path.join(self.downloads_folder, f"{fn}.pdf")): return fn
+        if stitle in self.PLACEHOLDER_TITLES: return None
+        fn = self.sanitize_filename(stitle)
+        if os.path.exists(os.path.join(self.downloads_folder, f"{fn}.pdf")): return fn
+        return None
 
     def sanitize_filename(self, fn):
-        fn = re.sub(r'[<>:"/\\|?*]', '', fn)
-        fn = re.sub(r'\s+',' ',fn).strip()[:200]
+        fn = self._FN_BAD.sub('', fn)
+        fn = self._FN_WS.sub(' ',fn).strip()[:200]
         return fn if fn else "untitled"
 
-    def extract_story_links(self, soup):
-        sels = [
-            'a[href*="/s/"]','h3 a[href*="/s/"]','h4 a[href*="/s/"]',
-            '.story-title a','div.story-list h3 a','div.content-item a[href*="story"]',
-            'article h2 a','h3 a, h4 a, h2 a'
-        ]
+    def extract_story_links(self, tree):
         found=[]
-        for s in sels:
-            links=soup.select(s)
+        for s in self.LINK_SELS:
+            links=_css(tree,s)
             if links:
                 for l in links:
-                    href=l.get('href')
+                    href=l.attributes.get('href')
                     if href:
                         full=urljoin(self.base_url,href)
-                        t=l.get_text(strip=True) or "Untitled"
+                        t=l.text(strip=True) or "Untitled"
                         found.append((t,full))
                 break
         seen=set(); uniq=[]
@@ -63,177 +199,190 @@ class StoryScraperFramework:
                 seen.add(u); uniq.append((t,u))
         return uniq
 
-    def extract_story_content(self, soup, story_url):
+    def extract_story_content(self, tree, story_url):
         title=""
-        t_sels=['h1','h1.headline','h1.story-title','h1.title','.story-title','.title',
-                'h2.entry-title','header h1','div.story-header h1','[class*="title"] h1',
-                'h1.storyname','div.story-header h2']
-        for s in t_sels:
-            el=soup.select_one(s)
-            if el: title=el.get_text(strip=True); break
+        for s in self.T_SELS:
+            el=tree.css_first(s)
+            if el: title=el.text(strip=True); break
         if not title: print("[WARNING] no title")
-        body_sels=['div.story-text p','.story-content p','.story-body p','#story p',
-                   'div[class*="story"] p','.content p','.entry-content p','div.content p',
-                   'article p','#story-text p','.post-content p','div.text p','main p','p']
         paras=[]
-        for s in body_sels:
-            ps=soup.select(s)
-            if ps:
-                val=[]
-                for p in ps:
-                    text=p.get_text(strip=True)
-                    if text and len(text)>10 and not any(a.get('href','').lower().startswith('/s/') for a in p.find_all('a')):
-                        val.append(text)
-                if val and len(val)>1: paras=val; break
+        for s in self.BODY_SELS:
+            it=_valid_paras(_css(tree,s))
+            first=next(it,None); second=next(it,None)
+            if second: paras=[first,second,*it]; break
         if not paras:
-            ps=soup.find_all('p')
-            if ps: paras=[p.get_text(strip=True) for p in ps if p.get_text(strip=True) and len(p.get_text(strip=True))>20]
+            ps=tree.css('p')
+            if ps: paras=[t for t in (p.text(strip=True) for p in ps) if len(t)>20]
         ch_links=[]
-        n_sels=['a[href*="chapter"]','a[href*="page"]','.next-chapter a','.pagination a[href*="page"]']
-        for s in n_sels:
-            links=soup.select(s)
-            for l in links:
-                href=l.get('href')
-                if href and ('next' in l.get_text().lower() or 'chapter' in href.lower() or l.get_text().strip().isdigit()):
-                    ch_links.append(urljoin(story_url,href))
+        for l in _css(tree,self.N_SEL):
+            href=l.attributes.get('href')
+            if href and ('next' in l.text().lower() or 'chapter' in href.lower() or l.text().strip().isdigit()):
+                ch_links.append(urljoin(story_url,href))
         series=None
-        se=soup.select_one('a.z_t[href*="/series/se/"]')
-        if se: series=urljoin(self.base_url,se['href'])
+        se=tree.css_first('a.z_t[href*="/series/se/"]')
+        if se: series=urljoin(self.base_url,se.attributes['href'])
         return title,paras,ch_links,series
 
+    def _get_page(self, url):
+        if self._stop.is_set(): return None
+        with self._cache_lock:
+            if url in self._page_cache:
+                self._page_cache.move_to_end(url); return self._page_cache[url]
+        r=self.make_request_with_retry(url)
+        if not r: return None
+        page=self.extract_story_content(self._parse(r),url)
+        with self._cache_lock:
+            self._page_cache[url]=page
+            if len(self._page_cache)>self.PAGE_CACHE: self._page_cache.popitem(last=False)
+        return page
+
     def find_series_link_from_all_pages(self, story_url):
-        done=set(); todo=[story_url]
+        todo=deque([story_url]); enq={story_url}
         while todo:
-            u=todo.pop(0)
-            if u in done: continue
-            done.add(u)
-            r=self.make_request_with_retry(u)
-            if not r: continue
-            soup=BeautifulSoup(r.content,'html.parser')
-            _,_,nexts,ser=self.extract_story_content(soup,u)
+            u=todo.popleft()
+            page=self._get_page(u)
+            if not page: continue
+            _,_,nexts,ser=page
             if ser: return ser
             for n in nexts:
-                if n not in done and n not in todo: todo.append(n)
+                if n not in enq: enq.add(n); todo.append(n)
         return None
 
     def create_pdf(self, title, paras, filename):
         try:
             fp=os.path.join(self.downloads_folder,f"{filename}.pdf")
             doc=SimpleDocTemplate(fp,pagesize=letter)
-            styles=getSampleStyleSheet(); story=[]
-            story.append(Paragraph(title,styles['Title'])); story.append(Spacer(1,12))
-            for item in paras:
-                if isinstance(item,str) and item.startswith("Chapter "):
-                    story.append(Paragraph(item,styles['Heading1'])); story.append(Spacer(1,24))
-                elif item.startswith("PART "):
-                    story.append(Paragraph(item,styles['Heading2'])); story.append(Spacer(1,12))
-                else:
-                    if item.strip():
-                        safe=item.replace('&','&amp;').replace('<','&lt;').replace('>','&gt;')
-                        story.append(Paragraph(safe,styles['Normal'])); story.append(Spacer(1,6))
+            styles=self._styles; story=[]
+            story.append(Paragraph(title.translate(_ESC),styles['Title'])); story.append(Spacer(1,12))
+            for kind,item in paras:
+                if kind=='p' and not item.strip(): continue
+                # only the generated PART n headings are known markup-safe
+                if kind!='h2': item=item.translate(_ESC)
+                sname,gap=_KINDS[kind]
+                story.append(Paragraph(item,styles[sname])); story.append(Spacer(1,gap))
             doc.build(story); return True
         except Exception as e:
             print(f"[ERROR] PDF fail {title}: {e}"); return False
 
+    def scrape_chapter(self, ct, curl):
+        print(f"  {ct}")
+        pages=deque([curl]); enq={curl}; part=1; pc=[]
+        while pages and not self._stop.is_set():
+            cu=pages.popleft()
+            page=self._get_page(cu)
+            if not page: continue
+            _,pp,nexts,_=page
+            if pp:
+                if part>1: pc.append(('h2',f"PART {part}"))
+                pc.extend(('p',t) for t in pp); print(f"    {ct} part {part} ok")
+            for n in nexts:
+                if n not in enq: enq.add(n); pages.append(n)
+            part+=1
+        return pc
+
     def scrape_story(self, stitle, surl, full_series=False):
+        held=set()
+        try: return self._scrape_story(stitle,surl,full_series,held)
+        finally:
+            # saved pdfs are found by the exists checks from here on
+            self._release(held)
+
+    def _scrape_story(self, stitle, surl, full_series, held):
+        if self._stop.is_set(): return False
         print(f"Story: {stitle}")
+        saved=self._already_saved(stitle,surl)
+        if saved:
+            print(f"[SKIP] {saved}.pdf exists"); return True
         series=None
         if full_series: series=self.find_series_link_from_all_pages(surl)
         if full_series and series:
             print(f"series found, scraping series for {stitle}")
             sr=self.make_request_with_retry(series)
             if sr:
-                soup_series=BeautifulSoup(sr.content,'html.parser')
-                st_el=soup_series.select_one('h1')
-                st=st_el.get_text(strip=True) if st_el else stitle
+                tree_series=self._parse(sr)
+                st_el=tree_series.css_first('h1')
+                st=st_el.text(strip=True) if st_el else stitle
                 safe=self.sanitize_filename(st)
                 path=os.path.join(self.downloads_folder,f"{safe}.pdf")
                 if os.path.exists(path):
+                    self._remember([surl],safe)
                     print(f"[SKIP] {safe}.pdf exists"); return True
-                ch_sels=['ul.series__works a.br_rj[href*="/s/"]','div.sl-list a.br_rj[href*="/s/"]',
-                         'div.sl-list a[href*="/s/"]','div.series-nav a[href*="/s/"]']
-                ch_links=[]
-                for s in ch_sels:
-                    es=soup_series.select(s)
-                    if es:
-                        for e in es:
-                            href=e.get('href')
-                            if href and '/s/' in href:
-                                full=href if href.startswith('http') else urljoin(self.base_url,href)
-                                ch_t=e.get_text(strip=True)
-                                m=re.search(r'(?:Ch\.?|Pt\.?)\s*(\d+)(?:-\d+)?',ch_t,re.I)
-                                if m: num=int(m.group(1))
-                                elif ch_t.strip()==st.strip() or ch_t.lower().startswith(st.lower()): num=1
-                                else: num=999
-                                ch_links.append((ch_t,full,num))
-                        if ch_links: break
+                if not self._claim(safe,held):
+                    self._remember([surl],safe)
+                    print(f"[SKIP] {safe}.pdf exists"); return True
+                ch_map={}
+                for s in self.CH_SELS:
+                    for e in _css(tree_series,s):
+                        href=e.attributes.get('href')
+                        if href and '/s/' in href:
+                            full=href if href.startswith('http') else urljoin(self.base_url,href)
+                            if full in ch_map: continue
+                            ch_t=e.text(strip=True)
+                            m=self._CH_NUM.search(ch_t)
+                            if m: num=int(m.group(1))
+                            elif ch_t.strip()==st.strip() or ch_t.lower().startswith(st.lower()): num=1
+                            else: num=999
+                            ch_map[full]=(ch_t,num)
+                    if ch_map: break
+                ch_links=sorted(((t,u,n) for u,(t,n) in ch_map.items()),key=lambda x:x[2])
                 if ch_links:
-                    ch_links.sort(key=lambda x:x[2])
+                    with ThreadPoolExecutor(max_workers=self.WORKERS) as ex:
+                        try: pcs=list(ex.map(lambda c:self.scrape_chapter(c[0],c[1]),ch_links))
+                        except BaseException:
+                            # don't let queued chapters run after Ctrl-C
+                            self._stop.set(); ex.shutdown(wait=False,cancel_futures=True); raise
+                    # a stopped run has partial chapters, don't save them
+                    if self._stop.is_set(): return False
                     allc=[]; cnum=1
-                    for ct,curl,_ in ch_links:
-                        print(f"  {ct}")
-                        pages=[curl]; done=set(); part=1; pc=[]
-                        while pages:
-                            cu=pages.pop(0)
-                            if cu in done: continue
-                            done.add(cu)
-                            pr=self.make_request_with_retry(cu)
-                            if not pr: continue
-                            ps=BeautifulSoup(pr.content,'html.parser')
-                            _,pp,nexts,_=self.extract_story_content(ps,cu)
-                            if pp:
-                                if part>1: pc.append(f"PART {part}")
-                                pc.extend(pp); print(f"    Part {part} ok")
-                            for n in nexts:
-                                if n not in done and n not in pages: pages.append(n)
-                            part+=1
-                        allc.append(f"Chapter {cnum}: {ct}" if cnum==1 else f"\nChapter {cnum}: {ct}")
+                    for (ct,_,_),pc in zip(ch_links,pcs):
+                        allc.append(('h1',f"Chapter {cnum}: {ct}"))
                         allc.extend(pc); cnum+=1
                     if allc and self.create_pdf(st,allc,safe):
+                        self._remember([surl]+[u for _,u,_ in ch_links],safe)
                         print(f"Done: {st} saved"); return True
+        # the series name is given up; holding it while waiting on another
+        # name below could deadlock two workers
+        self._release(held)
         print(f"  single story mode for {stitle}")
-        r=self.make_request_with_retry(surl)
-        if not r: return False
-        soup=BeautifulSoup(r.content,'html.parser')
-        t,pp,ch_links,_=self.extract_story_content(soup,surl)
+        page=self._get_page(surl)
+        if not page: return False
+        t,_,_,_=page
         ft=t or stitle; safe=self.sanitize_filename(ft)
         path=os.path.join(self.downloads_folder,f"{safe}.pdf")
         if os.path.exists(path):
+            self._remember([surl],safe)
             print(f"[SKIP] {safe}.pdf exists"); return True
-        allc=[]; done=set(); todo=[surl]; part=1
-        while todo:
-            cu=todo.pop(0)
-            if cu in done: continue
-            done.add(cu)
-            if cu==surl: paras=pp; chs=ch_links
-            else:
-                rr=self.make_request_with_retry(cu)
-                if not rr: continue
-                ps=BeautifulSoup(rr.content,'html.parser')
-                _,paras,chs,_=self.extract_story_content(ps,cu)
+        if not self._claim(safe,held):
+            self._remember([surl],safe)
+            print(f"[SKIP] {safe}.pdf exists"); return True
+        allc=[]; todo=deque([surl]); enq={surl}; part=1
+        while todo and not self._stop.is_set():
+            cu=todo.popleft()
+            page=self._get_page(cu)
+            if not page: continue
+            _,paras,chs,_=page
             if paras:
-                if part>1: allc.append(f"PART {part}")
-                allc.extend(paras); print(f"    Part {part} ok")
+                if part>1: allc.append(('h2',f"PART {part}"))
+                allc.extend(('p',t) for t in paras); print(f"    Part {part} ok")
             for ch in chs:
-                if ch not in done and ch not in todo: todo.append(ch)
+                if ch not in enq: enq.add(ch); todo.append(ch)
             part+=1
+        if self._stop.is_set(): return False
         if allc and self.create_pdf(ft,allc,safe):
+            self._remember([surl],safe)
             print(f"Done: {ft} saved"); return True
         else:
             print(f"[ERROR] no content {stitle}"); return False
 
-    def get_next_page_url(self, soup, cur):
-        sels=['a[href*="page="]','.pagination .next','a[rel="next"]','.page-numbers.next']
-        if soup:
-            for s in sels:
-                ls=soup.select(s)
-                for l in ls:
-                    href=l.get('href')
-                    if href and ('next' in l.get_text().lower() or f'page={cur+1}' in href):
-                        return urljoin(self.base_url,href)
+    def get_next_page_url(self, tree, cur):
+        if tree:
+            for l in tree.css(self.PAGE_SEL):
+                href=l.attributes.get('href')
+                if href and ('next' in l.text().lower() or f'page={cur+1}' in href):
+                    return urljoin(self.base_url,href)
         if '?' in self.base_url:
             if 'page=' in self.base_url:
-                nxt=re.sub(r'page=\d+',f'page={cur+1}',self.base_url)
+                nxt=self._PAGE_NUM.sub(f'page={cur+1}',self.base_url)
             else: nxt=f"{self.base_url}&page={cur+1}"
         else: nxt=f"{self.base_url}?page={cur+1}"
         if self.base_url.startswith('https://tags.literotica.com/'):
@@ -249,14 +398,21 @@ class StoryScraperFramework:
             done.add(page)
             r=self.make_request_with_retry(page)
             if not r: break
-            soup=BeautifulSoup(r.content,'html.parser')
-            stories=self.extract_story_links(soup)
+            tree=self._parse(r)
+            stories=self.extract_story_links(tree)
             if not stories: break
             print(f"{len(stories)} stories on page {cur}")
             found+=len(stories)
-            for i,(st,surl) in enumerate(stories,1):
-                print(f"Story {i}/{len(stories)}")
-                if self.scrape_story(st,surl,full_series=True): saved+=1
+            with ThreadPoolExecutor(max_workers=self.WORKERS) as ex:
+                futs={ex.submit(self.scrape_story,st,surl,True):st for st,surl in stories}
+                try:
+                    for i,fut in enumerate(as_completed(futs),1):
+                        print(f"Story {i}/{len(stories)} finished: {futs[fut]}")
+                        if fut.result(): saved+=1
+                except BaseException:
+                    # don't let queued stories run after Ctrl-C, and make the
+                    # running ones stop (only the main thread gets Ctrl-C)
+                    self._stop.set(); ex.shutdown(wait=False,cancel_futures=True); raise
             cur+=1
         print(f"Done! found:{found} saved:{saved}")
 